@@ -11,15 +11,22 @@ Description:
     - Dark/Light mode toggle
 """
 
+import io
 import json
-import csv
+import mmap
+
+# orjson is ~5x faster than stdlib json; fall back gracefully if missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import os
 import math
-import tempfile
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
 # plotting libraries
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
@@ -32,26 +39,28 @@ from PIL import Image
 # --- Configuration Constants ---
 LOGO_PATH = "/mnt/data/e0504538-8166-45e2-8ff5-de5ab1ec01e9.png"
 DATA_FILE = "students.json"
+MMAP_THRESHOLD = 256 * 1024  # below this, mmap setup costs more than it saves
 
 # --- Helper Functions ---
 
+# Grade per 10-mark band, indexed by marks // 10 (0..10).
+# Same ranges as the old if-chain: >=90 S, >=80 A, ... >=40 E, else N.
+_GRADE_TABLE = ('N', 'N', 'N', 'N', 'E', 'D', 'C', 'B', 'A', 'S', 'S')
+
+
 def get_grade_letter(marks):
     """
     Returns the grade letter based on the specific ranges requested.
     Input should be a float.
     """
     try:
-        val = float(marks)
+        # Clamp before int(): keeps inf/-inf from raising OverflowError and
+        # makes the band index safe without a second min/max
+        band = int(min(max(float(marks), 0.0), 100.0)) // 10
     except (ValueError, TypeError):
-        return 'N'  # Return N if data is garbage
+        return 'N'  # Return N if data is garbage (int(nan) lands here too)
 
-    if val >= 90: return 'S'
-    if val >= 80: return 'A'
-    if val >= 70: return 'B'
-    if val >= 60: return 'C'
-    if val >= 50: return 'D'
-    if val >= 40: return 'E'
-    return 'N'  # Fail grade
+    return _GRADE_TABLE[band]
 
 
 # --- Data Management Class ---
@@ -61,11 +70,51 @@ class StudentBackend:
     Handles all the file I/O operations. 
     It saves data to JSON and exports to CSV.
     """
-    def __init__(self, filename=DATA_FILE):
+    def __init__(self, filename=DATA_FILE, root=None):
         self.filename = filename
         self.students = {}  # Dictionary format: { "ROLL": {"name": "X", "marks": 90} }
+
+        # Lazy-write state: coalesce bursts of edits into one disk write.
+        # If no Tk root is given we fall back to saving immediately.
+        self.root = root
+        self._dirty = False
+        self._flush_after_ms = 500
+        self._pending_id = None
+
+        # Cached sorted views, invalidated whenever the data changes.
+        # Saves re-sorting the whole class on every keystroke/refresh.
+        self._sort_cache = {}
+        self._cache_version = 0
+        self._search_index = None  # lowercase haystacks, rebuilt lazily
+        self._marks_arr = None     # numpy column of marks, rebuilt lazily
+        self._display_rows = {}    # roll -> (roll, name, marks, grade) for the table
+
         self.load_data()
 
+    def _invalidate_cache(self):
+        """Drops cached views after any mutation."""
+        self._sort_cache.clear()
+        self._search_index = None
+        self._marks_arr = None
+        self._cache_version += 1
+
+    @property
+    def data_version(self):
+        """Monotonic counter bumped on every mutation; lets callers key caches."""
+        return self._cache_version
+
+    def get_marks_array(self):
+        """
+        Returns the marks column as a numpy array (struct-of-arrays view of
+        the student dict), rebuilt only when the data changes.
+        """
+        if self._marks_arr is None:
+            self._marks_arr = np.fromiter(
+                (s['marks'] for s in self.students.values()),
+                dtype=float, count=len(self.students)
+            )
+        return self._marks_arr
+
     def load_data(self):
         """
         Loads data from the disk. 
@@ -76,122 +125,237 @@ class StudentBackend:
             return
 
         try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
-        except (json.JSONDecodeError, IOError):
+            if orjson is not None:
+                with open(self.filename, 'rb') as f:
+                    if os.path.getsize(self.filename) >= MMAP_THRESHOLD:
+                        # Parse straight out of the page cache; skips copying
+                        # the whole file into an intermediate bytes object
+                        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        try:
+                            with memoryview(mm) as view:
+                                raw_data = orjson.loads(view)
+                        finally:
+                            mm.close()
+                    else:
+                        raw_data = orjson.loads(f.read())
+            else:
+                with open(self.filename, 'r', encoding='utf-8') as f:
+                    raw_data = json.load(f)
+        except (ValueError, IOError):
             # If the file is totally broken, start fresh
             self.students = {}
             return
 
         # Sanitize / Repair logic
         clean_data = {}
+        needs_repair = False
         for roll, info in raw_data.items():
             clean_roll = str(roll).upper().strip()
-            
+            if clean_roll != roll:
+                needs_repair = True
+
             # Check if it's the new dictionary format or old simple format
             if isinstance(info, dict):
                 clean_name = str(info.get('name', 'UNKNOWN')).upper()
                 try:
                     clean_marks = float(info.get('marks', 0))
-                except ValueError:
+                except (ValueError, TypeError):
                     clean_marks = 0.0
+                if not math.isfinite(clean_marks):
+                    # inf/nan won't survive a JSON round-trip (orjson writes
+                    # null), so repair them to 0 rather than persist garbage
+                    clean_marks = 0.0
+                if info.get('name') != clean_name or info.get('marks') != clean_marks:
+                    needs_repair = True
             else:
                 # Attempt to rescue data from old format (Roll -> Marks)
                 clean_name = "UNKNOWN"
                 try:
                     clean_marks = float(info)
-                except ValueError:
+                except (ValueError, TypeError):
                     clean_marks = 0.0
-            
+                if not math.isfinite(clean_marks):
+                    clean_marks = 0.0
+                needs_repair = True
+
             clean_data[clean_roll] = {"name": clean_name, "marks": clean_marks}
 
         self.students = clean_data
-        
-        # Save the repaired version back immediately to fix the file
-        self.save_data()
+        self._invalidate_cache()
+        self._display_rows.clear()
+
+        # Only write the repaired version back if something actually changed;
+        # a clean file costs no serialize+fsync on startup
+        if needs_repair:
+            self.schedule_save()
+
+    def schedule_save(self):
+        """
+        Marks the data dirty and schedules a single deferred save.
+        Repeated calls within the window are coalesced into one write,
+        so bulk edits don't hammer the disk once per change.
+        """
+        self._dirty = True
+
+        if self.root is None:
+            # No event loop available (e.g. headless use) - save right away
+            self._flush()
+            return
+
+        if self._pending_id is not None:
+            self.root.after_cancel(self._pending_id)
+        self._pending_id = self.root.after(self._flush_after_ms, self._flush)
+
+    def _flush(self):
+        """Performs the actual write if there are unsaved changes."""
+        self._pending_id = None
+        if self._dirty:
+            self.save_data()
+            self._dirty = False
+
+    def flush(self):
+        """Forces any pending save to disk immediately (used on app close)."""
+        if self._pending_id is not None:
+            self.root.after_cancel(self._pending_id)
+        self._flush()
 
     def save_data(self):
-        """Saves current state to JSON."""
+        """
+        Saves current state to JSON.
+        Writes to a temp file and atomically replaces the original, so a
+        crash mid-write can never leave a half-written students.json behind.
+        """
+        tmp_path = self.filename + ".tmp"
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(self.students, f, indent=4, ensure_ascii=False)
+            if orjson is not None:
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(
+                        self.students,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                    ))
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.students, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.filename)
         except IOError:
             print("Error: Could not save data to disk.")
 
     def upsert_student(self, roll, name, marks):
         """Adds or Updates a student."""
-        self.students[str(roll).upper()] = {
-            "name": str(name).upper(), 
-            "marks": float(marks)
-        }
-        self.save_data()
+        roll = str(roll).upper()
+        name = str(name).upper()
+        marks = float(marks)
+        self.students[roll] = {"name": name, "marks": marks}
+        self._invalidate_cache()
+        # Precompute the table row at write time so refreshes just read it
+        self._display_rows[roll] = (roll, name, marks, get_grade_letter(marks))
+        self.schedule_save()
 
     def remove_student(self, roll):
         """Deletes a student if they exist."""
         roll = str(roll).upper()
         if roll in self.students:
             del self.students[roll]
-            self.save_data()
+            self._invalidate_cache()
+            self._display_rows.pop(roll, None)
+            self.schedule_save()
+
+    def get_display_row(self, roll):
+        """
+        Returns the cached (roll, name, marks, grade) tuple for one student.
+        Rows are precomputed on upsert and rebuilt lazily after a load, so
+        table refreshes do no per-row formatting.
+        """
+        row = self._display_rows.get(roll)
+        if row is None:
+            data = self.students[roll]
+            row = (roll, data['name'], data['marks'], get_grade_letter(data['marks']))
+            self._display_rows[roll] = row
+        return row
 
     def get_sorted_list(self, sort_by='Roll'):
-        """Returns the dictionary sorted based on the user's choice."""
+        """
+        Returns a list of (roll, data) tuples sorted based on the user's choice.
+        Results are cached per sort key until the data changes.
+        """
+        cached = self._sort_cache.get(sort_by)
+        if cached is not None:
+            return cached
+
         items = self.students.items()
-        
+
         if sort_by == 'Name':
-            return dict(sorted(items, key=lambda x: x[1]['name']))
+            result = sorted(items, key=lambda x: x[1]['name'])
         elif sort_by == 'Marks':
-            return dict(sorted(items, key=lambda x: x[1]['marks'], reverse=True))
+            result = sorted(items, key=lambda x: x[1]['marks'], reverse=True)
         else:
-            # Default to Roll number (try to sort numerically if possible)
+            # Default to Roll number: numeric rolls sort numerically and come
+            # before non-numeric ones (tuple key avoids int/str comparisons)
             def roll_sorter(item):
-                try: 
-                    return int(item[0]) 
-                except: 
-                    return item[0]
-            return dict(sorted(items, key=roll_sorter))
+                roll = item[0]
+                return (0, int(roll), '') if roll.isdigit() else (1, 0, roll)
+            result = sorted(items, key=roll_sorter)
+
+        self._sort_cache[sort_by] = result
+        return result
 
     def search_students(self, query):
         """Returns a set of Roll numbers matching the query."""
         if not query:
             return set(self.students.keys())
-        
+
+        if self._search_index is None:
+            # Precompute the lowercase haystack once per data version so each
+            # keystroke doesn't re-lowercase every roll and name.
+            # \x1f keeps roll and name from matching across the boundary.
+            self._search_index = [
+                (roll.lower() + '\x1f' + data['name'].lower(), roll)
+                for roll, data in self.students.items()
+            ]
+
         q = query.lower()
-        results = set()
-        for roll, data in self.students.items():
-            if q in roll.lower() or q in data['name'].lower():
-                results.add(roll)
-        return results
+        return {roll for hay, roll in self._search_index if q in hay}
 
     def get_statistics(self):
-        """Calculates basic class stats."""
+        """Calculates basic class stats, vectorized over the marks column."""
         if not self.students:
             return {"total": 0, "max": 0, "min": 0, "avg": 0}
-        
-        mark_list = [s['marks'] for s in self.students.values()]
+
+        arr = self.get_marks_array()
         return {
-            "total": len(mark_list),
-            "max": max(mark_list),
-            "min": min(mark_list),
-            "avg": sum(mark_list) / len(mark_list)
+            "total": int(arr.size),
+            "max": float(arr.max()),
+            "min": float(arr.min()),
+            "avg": float(arr.mean())
         }
 
     def export_to_csv(self, filepath):
+        """Exports a ranked CSV with one big buffered write (no per-row writer calls)."""
+        def esc(field):
+            # Minimal CSV quoting - only names can realistically need it
+            s = str(field)
+            if '"' in s or ',' in s or '\n' in s:
+                return '"' + s.replace('"', '""') + '"'
+            return s
+
         try:
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Rank", "Roll Number", "Name", "Marks", "Grade"])
-                
-                # Sort by marks for the CSV ranking
-                ranked_students = sorted(self.students.items(), key=lambda x: x[1]['marks'], reverse=True)
-                
-                for rank, (roll, data) in enumerate(ranked_students, 1):
-                    writer.writerow([
-                        rank, 
-                        roll, 
-                        data['name'], 
-                        data['marks'], 
-                        get_grade_letter(data['marks'])
-                    ])
+            # Sort by marks for the CSV ranking (shares the cached view)
+            ranked_students = self.get_sorted_list('Marks')
+
+            rows = [
+                f"{rank},{esc(roll)},{esc(data['name'])},{data['marks']},{get_grade_letter(data['marks'])}"
+                for rank, (roll, data) in enumerate(ranked_students, 1)
+            ]
+
+            with open(filepath, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+                f.write("Rank,Roll Number,Name,Marks,Grade\n")
+                f.write("\n".join(rows))
+                if rows:
+                    f.write("\n")
             return True
         except Exception as e:
             return str(e)
@@ -205,13 +369,20 @@ class GradeApp:
         self.root.title("VIT-Yarthi Student Grade Management System")
         self.root.geometry("1200x800")
         
-        # Initialize Backend
-        self.db = StudentBackend()
+        # Initialize Backend (pass the root so saves can be debounced)
+        self.db = StudentBackend(root=root)
         
         # App State
         self.is_dark_mode = True  # Default to dark mode because it looks cooler
         self.chart_bars = []      # To store bar objects for hover effects
         self.chart_points = []    # To store line points for hover effects
+        self._search_after = None # Pending after() id for debounced search
+        self._tree_rows = {}      # roll -> Treeview iid, for incremental updates
+        self._tree_values = {}    # roll -> last values tuple shown for that row
+
+        # Rendered chart PNGs for PDF export, keyed by (data version, sort,
+        # theme) so repeat exports skip the expensive savefig renders
+        self._pdf_chart_cache = {'key': None, 'line_png': None, 'bar_png': None}
         
         # Setup the UI
         self.setup_styles()
@@ -220,6 +391,14 @@ class GradeApp:
         # Load initial data
         self.refresh_dashboard()
 
+        # Make sure any pending debounced save hits the disk before we exit
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Flushes unsaved data and shuts the window down."""
+        self.db.flush()
+        self.root.destroy()
+
     def setup_styles(self):
         """Defines the colors and fonts for the app."""
         self.style = ttk.Style()
@@ -235,12 +414,20 @@ class GradeApp:
             self.entry_bg = '#1e1e1e'
             self.btn_bg = '#333333'
             self.tree_bg = '#2d2d2d'
+            self.chart_bg = '#121212'
+            self.chart_fg = 'white'
+            self.bar_color = '#ffa726'
+            self.line_color = '#29b6f6'
         else:
             self.bg_color = '#f0f0f0'
             self.fg_color = '#000000'
             self.entry_bg = '#ffffff'
             self.btn_bg = '#e0e0e0'
             self.tree_bg = '#ffffff'
+            self.chart_bg = '#ffffff'
+            self.chart_fg = 'black'
+            self.bar_color = '#ff9800'
+            self.line_color = '#039be5'
 
         self.root.configure(bg=self.bg_color)
         
@@ -258,9 +445,29 @@ class GradeApp:
                              rowheight=25)
         self.style.configure('Treeview.Heading', font=('Segoe UI', 10, 'bold'))
         
-        # Redraw charts if they exist
+        # Recolor chart artists in place if the charts exist already.
+        # No redraw here: refresh_dashboard is the single draw entry point,
+        # so a theme toggle costs one chart redraw instead of two.
         if hasattr(self, 'fig_line'):
-            self.refresh_charts()
+            self.apply_chart_theme()
+
+    def apply_chart_theme(self):
+        """Pushes the current theme colors onto the existing chart artists."""
+        for fig, ax in ((self.fig_bar, self.ax_bar), (self.fig_line, self.ax_line)):
+            fig.patch.set_facecolor(self.chart_bg)
+            ax.set_facecolor(self.chart_bg)
+            ax.tick_params(colors=self.chart_fg)
+            for spine in ax.spines.values():
+                spine.set_color(self.chart_fg)
+            ax.yaxis.label.set_color(self.chart_fg)
+            ax.xaxis.label.set_color(self.chart_fg)
+            ax.title.set_color(self.chart_fg)
+
+        self._line.set_color(self.line_color)
+        for rect in self._bar_rects:
+            rect.set_color(self.bar_color)
+        for txt in self._value_texts:
+            txt.set_color(self.chart_fg)
 
     def create_widgets(self):
         # Header Section
@@ -275,12 +482,12 @@ class GradeApp:
         # Input Fields
         ttk.Label(left_panel, text="Roll Number:").pack(anchor='w', pady=(5,0))
         self.var_roll = tk.StringVar()
-        self.var_roll.trace("w", lambda *args: self.var_roll.set(self.var_roll.get().upper())) # Auto-Upper
+        self.var_roll.trace_add("write", lambda *args: self._auto_upper(self.var_roll)) # Auto-Upper
         ttk.Entry(left_panel, textvariable=self.var_roll).pack(fill='x', pady=5)
-        
+
         ttk.Label(left_panel, text="Name:").pack(anchor='w', pady=(5,0))
         self.var_name = tk.StringVar()
-        self.var_name.trace("w", lambda *args: self.var_name.set(self.var_name.get().upper()))
+        self.var_name.trace_add("write", lambda *args: self._auto_upper(self.var_name))
         ttk.Entry(left_panel, textvariable=self.var_name).pack(fill='x', pady=5)
         
         ttk.Label(left_panel, text="Marks (0-100):").pack(anchor='w', pady=(5,0))
@@ -300,7 +507,7 @@ class GradeApp:
         
         ttk.Label(left_panel, text="Search:").pack(anchor='w')
         self.var_search = tk.StringVar()
-        self.var_search.trace("w", lambda *a: self.refresh_table()) # Live search
+        self.var_search.trace_add("write", lambda *a: self._schedule_search()) # Live search (debounced)
         ttk.Entry(left_panel, textvariable=self.var_search).pack(fill='x', pady=5)
         
         ttk.Label(left_panel, text="Sort By:").pack(anchor='w', pady=(5,0))
@@ -347,32 +554,116 @@ class GradeApp:
         self.fig_line, self.ax_line = plt.subplots(figsize=(8, 2.5), dpi=100)
         self.canvas_line = FigureCanvasTkAgg(self.fig_line, master=parent_frame)
         self.canvas_line.get_tk_widget().pack(fill='both', expand=True, pady=(0, 5))
-        
+
         # Bar Chart (Bottom)
         self.fig_bar, self.ax_bar = plt.subplots(figsize=(8, 2.5), dpi=100)
         self.canvas_bar = FigureCanvasTkAgg(self.fig_bar, master=parent_frame)
         self.canvas_bar.get_tk_widget().pack(fill='both', expand=True)
 
+        # Create the chart artists ONCE; refresh_charts only mutates their
+        # data afterwards. Rebuilding artists via ax.clear() on every refresh
+        # is matplotlib's slowest path and caused the live-search flicker.
+        self._bar_rects = []    # pooled bar Rectangles, grown on demand
+        self._value_texts = []  # pooled value labels shown above the bars
+        self._line, = self.ax_line.plot([], [], marker='o', linewidth=2)
+
+        # Static decoration, set once
+        self.ax_bar.set_title("Performance Overview (Bar Chart)")
+        self.ax_bar.set_ylim(0, 110)
+        self.ax_line.set_title("Marks Trend (Line Chart)")
+        self.ax_line.set_ylim(0, 110)
+
         # Connect Hover Events
         self.canvas_bar.mpl_connect("motion_notify_event", self.on_bar_hover)
         self.canvas_line.mpl_connect("motion_notify_event", self.on_line_hover)
-        
+
+        # Blitting state: cache the rendered background of each axes so the
+        # hover tooltips can be painted without a full-figure redraw.
+        self._bg_bar = None
+        self._bg_line = None
+        self.canvas_bar.mpl_connect("draw_event", self._capture_bar_bg)
+        self.canvas_line.mpl_connect("draw_event", self._capture_line_bg)
+
         # Create the tooltip annotation (hidden by default)
         self.tooltip = self.ax_bar.annotate(
             "", xy=(0,0), xytext=(15, 15), textcoords="offset points",
             bbox=dict(boxstyle="round", fc="w"), arrowprops=dict(arrowstyle="->")
         )
         self.tooltip.set_visible(False)
-        
+        self.tooltip.set_animated(True)  # excluded from normal draws; blitted
+
         # Tooltip for line chart
         self.tooltip_line = self.ax_line.annotate(
             "", xy=(0,0), xytext=(15, 15), textcoords="offset points",
             bbox=dict(boxstyle="round", fc="w"), arrowprops=dict(arrowstyle="->")
         )
         self.tooltip_line.set_visible(False)
+        self.tooltip_line.set_animated(True)
+
+        # Paint the theme onto the freshly made artists
+        self.apply_chart_theme()
+
+    def _capture_bar_bg(self, event):
+        self._bg_bar = self.canvas_bar.copy_from_bbox(self.ax_bar.bbox)
+
+    def _capture_line_bg(self, event):
+        self._bg_line = self.canvas_line.copy_from_bbox(self.ax_line.bbox)
+
+    def _blit_bar_tooltip(self):
+        """Repaints just the bar tooltip over the cached background."""
+        if self._bg_bar is None:
+            self.canvas_bar.draw_idle()
+            return
+        self.canvas_bar.restore_region(self._bg_bar)
+        if self.tooltip.get_visible():
+            self.ax_bar.draw_artist(self.tooltip)
+        self.canvas_bar.blit(self.ax_bar.bbox)
+
+    def _blit_line_tooltip(self):
+        """Repaints just the line tooltip over the cached background."""
+        if self._bg_line is None:
+            self.canvas_line.draw_idle()
+            return
+        self.canvas_line.restore_region(self._bg_line)
+        if self.tooltip_line.get_visible():
+            self.ax_line.draw_artist(self.tooltip_line)
+        self.canvas_line.blit(self.ax_line.bbox)
+
+    def _ensure_chart_pool(self, n):
+        """Grows the pooled bar/text artists so at least n are available."""
+        while len(self._bar_rects) < n:
+            i = len(self._bar_rects)
+            rect = self.ax_bar.bar([i], [0], color=self.bar_color, width=0.6)[0]
+            txt = self.ax_bar.text(i, 0, '', ha='center', va='bottom',
+                                   color=self.chart_fg, fontsize=8)
+            self._bar_rects.append(rect)
+            self._value_texts.append(txt)
 
     # --- Logic & Actions ---
 
+    def _auto_upper(self, var):
+        """
+        Uppercases a StringVar in place. Only writes back when the value
+        actually changes, so the write trace doesn't re-fire on every key.
+        """
+        value = var.get()
+        upper = value.upper()
+        if value != upper:
+            var.set(upper)
+
+    def _schedule_search(self):
+        """
+        Debounces the live search: a burst of keystrokes collapses into a
+        single table refresh once typing pauses for 120ms.
+        """
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(120, self._run_search)
+
+    def _run_search(self):
+        self._search_after = None
+        self.refresh_table()
+
     def action_add_update(self):
         roll = self.var_roll.get().strip()
         name = self.var_name.get().strip()
@@ -438,27 +729,43 @@ class GradeApp:
     # --- Dashboard Updates (The heavy lifting) ---
 
     def refresh_dashboard(self):
-        self.refresh_table()
+        # Fetch the sorted view once and share it between table and charts
+        sorted_data = self.db.get_sorted_list(self.var_sort.get())
+        self.refresh_table(sorted_data)
         self.refresh_stats()
-        self.refresh_charts()
+        self.refresh_charts(sorted_data)
 
-    def refresh_table(self):
-        # Clear existing
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
+    def refresh_table(self, sorted_data=None):
         # Filter and Sort
         search_hits = self.db.search_students(self.var_search.get())
-        sorted_data = self.db.get_sorted_list(self.var_sort.get())
-        
-        for roll, data in sorted_data.items():
-            if roll in search_hits:
-                self.tree.insert("", "end", values=(
-                    roll, 
-                    data['name'], 
-                    data['marks'], 
-                    get_grade_letter(data['marks'])
-                ))
+        if sorted_data is None:
+            sorted_data = self.db.get_sorted_list(self.var_sort.get())
+
+        # Diff against what the Treeview already shows instead of doing a
+        # full clear-and-reinsert (insertion is the slow Tk call here).
+        desired = [
+            (roll, self.db.get_display_row(roll))
+            for roll, _ in sorted_data if roll in search_hits
+        ]
+        desired_rolls = {roll for roll, _ in desired}
+
+        # Drop rows that no longer belong
+        for roll in list(self._tree_rows):
+            if roll not in desired_rolls:
+                self.tree.delete(self._tree_rows.pop(roll))
+                self._tree_values.pop(roll, None)
+
+        # Walk the desired order: move/update surviving rows, insert new ones
+        for index, (roll, values) in enumerate(desired):
+            iid = self._tree_rows.get(roll)
+            if iid is None:
+                self._tree_rows[roll] = self.tree.insert("", index, values=values)
+                self._tree_values[roll] = values
+            else:
+                self.tree.move(iid, "", index)
+                if self._tree_values[roll] != values:
+                    self.tree.item(iid, values=values)
+                    self._tree_values[roll] = values
 
     def refresh_stats(self):
         s = self.db.get_statistics()
@@ -471,124 +778,106 @@ class GradeApp:
         )
         self.lbl_stats.config(text=text)
 
-    def refresh_charts(self):
+    def refresh_charts(self, sorted_data=None):
         # Gather data in the correct sorted order
-        sorted_data = self.db.get_sorted_list(self.var_sort.get())
-        rolls = list(sorted_data.keys())
-        names = [d['name'] for d in sorted_data.values()]
-        marks = [d['marks'] for d in sorted_data.values()]
-        
-        # Define colors based on theme
-        bg = '#121212' if self.is_dark_mode else '#ffffff'
-        fg = 'white' if self.is_dark_mode else 'black'
-        bar_color = '#ffa726' if self.is_dark_mode else '#ff9800'
-        line_color = '#29b6f6' if self.is_dark_mode else '#039be5'
-
-        # --- Draw Bar Chart ---
-        self.ax_bar.clear()
-        self.fig_bar.patch.set_facecolor(bg)
-        self.ax_bar.set_facecolor(bg)
-        self.ax_bar.tick_params(colors=fg)
-        for spine in self.ax_bar.spines.values(): spine.set_color(fg)
-        self.ax_bar.yaxis.label.set_color(fg)
-        self.ax_bar.xaxis.label.set_color(fg)
-        self.ax_bar.title.set_color(fg)
-
-        if marks:
-            x_pos = range(len(rolls))
-            bars = self.ax_bar.bar(x_pos, marks, color=bar_color, width=0.6)
-            
-            # X-axis Labels (Roll + Name)
-            labels = [f"{r}\n{n}" for r, n in zip(rolls, names)]
-            self.ax_bar.set_xticks(x_pos)
-            self.ax_bar.set_xticklabels(labels, rotation=0, fontsize=8)
-            
-            # Store bars for hover
-            self.chart_bars = list(zip(bars, rolls, names, marks))
-            
-            # Add value on top of bars
-            for rect in bars:
-                h = rect.get_height()
-                self.ax_bar.text(rect.get_x() + rect.get_width()/2., h + 1,
-                                 f'{int(h)}', ha='center', va='bottom', color=fg, fontsize=8)
-        
-        self.ax_bar.set_title("Performance Overview (Bar Chart)")
-        self.ax_bar.set_ylim(0, 110)
-        self.canvas_bar.draw()
-
-        # --- Draw Line Chart ---
-        self.ax_line.clear()
-        self.fig_line.patch.set_facecolor(bg)
-        self.ax_line.set_facecolor(bg)
-        self.ax_line.tick_params(colors=fg)
-        for spine in self.ax_line.spines.values(): spine.set_color(fg)
-        self.ax_line.yaxis.label.set_color(fg)
-        self.ax_line.xaxis.label.set_color(fg)
-        self.ax_line.title.set_color(fg)
-
-        self.chart_points = []
-        if marks:
-            x_vals = range(len(marks))
-            self.ax_line.plot(x_vals, marks, marker='o', color=line_color, linewidth=2)
-            
-            # Store points for hover detection
-            for i, (r, n, m) in enumerate(zip(rolls, names, marks)):
-                self.chart_points.append((i, m, r, n))
+        if sorted_data is None:
+            sorted_data = self.db.get_sorted_list(self.var_sort.get())
+        rolls = [r for r, _ in sorted_data]
+        names = [d['name'] for _, d in sorted_data]
+        # numpy column: matplotlib takes ndarrays without an internal convert
+        marks = np.fromiter((d['marks'] for _, d in sorted_data),
+                            dtype=float, count=len(sorted_data))
+        n = len(marks)
+
+        # --- Update Bar Chart (mutate pooled artists, no ax.clear) ---
+        self._ensure_chart_pool(n)
+        for i, (rect, txt) in enumerate(zip(self._bar_rects, self._value_texts)):
+            if i < n:
+                rect.set_height(marks[i])
+                rect.set_visible(True)
+                txt.set_position((i, marks[i] + 1))
+                txt.set_text(f'{int(marks[i])}')
+                txt.set_visible(True)
+            else:
+                rect.set_visible(False)
+                txt.set_visible(False)
 
-            self.ax_line.set_xticks(x_vals)
-            self.ax_line.set_xticklabels(range(1, len(marks)+1)) # Just rank numbers
-        
-        self.ax_line.set_title("Marks Trend (Line Chart)")
-        self.ax_line.set_ylim(0, 110)
-        self.canvas_line.draw()
+        x_pos = np.arange(n)
+        # X-axis Labels (Roll + Name)
+        labels = [f"{r}\n{nm}" for r, nm in zip(rolls, names)]
+        self.ax_bar.set_xticks(x_pos)
+        self.ax_bar.set_xticklabels(labels, rotation=0, fontsize=8)
+        self.ax_bar.set_xlim(-0.5, max(n - 0.5, 0.5))
+
+        # Store bars for hover
+        self.chart_bars = list(zip(self._bar_rects[:n], rolls, names, marks))
+        self.canvas_bar.draw_idle()
+
+        # --- Update Line Chart ---
+        self._line.set_data(x_pos, marks)
+
+        # Store points for hover detection
+        self.chart_points = [(i, m, r, nm)
+                             for i, (r, nm, m) in enumerate(zip(rolls, names, marks))]
+
+        self.ax_line.set_xticks(x_pos)
+        self.ax_line.set_xticklabels(range(1, n + 1)) # Just rank numbers
+        self.ax_line.set_xlim(-0.5, max(n - 0.5, 0.5))
+        self.canvas_line.draw_idle()
 
     # --- Hover Logic ---
 
     def on_bar_hover(self, event):
         """Shows a tooltip when hovering over a bar."""
         if event.inaxes != self.ax_bar:
-            self.tooltip.set_visible(False)
-            self.canvas_bar.draw_idle()
+            if self.tooltip.get_visible():
+                self.tooltip.set_visible(False)
+                self._blit_bar_tooltip()
             return
 
+        # Bars sit on integer x positions with a fixed width, so the hit-test
+        # is a direct index instead of an O(N) contains() scan.
         found = False
-        for bar, roll, name, mark in self.chart_bars:
-            if bar.contains(event)[0]:
-                self.tooltip.xy = (bar.get_x() + bar.get_width() / 2, bar.get_height())
-                text = f"{roll}: {name}\nMarks: {mark}"
-                self.tooltip.set_text(text)
+        if event.xdata is not None and event.ydata is not None:
+            idx = int(round(event.xdata))
+            if (0 <= idx < len(self.chart_bars)
+                    and abs(event.xdata - idx) <= 0.3   # half the bar width
+                    and 0 <= event.ydata <= self.chart_bars[idx][3]):
+                bar, roll, name, mark = self.chart_bars[idx]
+                self.tooltip.xy = (idx, mark)
+                self.tooltip.set_text(f"{roll}: {name}\nMarks: {mark}")
                 self.tooltip.set_visible(True)
-                self.canvas_bar.draw_idle()
+                self._blit_bar_tooltip()
                 found = True
-                break
-        
+
         if not found and self.tooltip.get_visible():
             self.tooltip.set_visible(False)
-            self.canvas_bar.draw_idle()
+            self._blit_bar_tooltip()
 
     def on_line_hover(self, event):
         """Shows a tooltip when hovering near a line point."""
         if event.inaxes != self.ax_line:
-            self.tooltip_line.set_visible(False)
-            self.canvas_line.draw_idle()
+            if self.tooltip_line.get_visible():
+                self.tooltip_line.set_visible(False)
+                self._blit_line_tooltip()
             return
 
+        # Points sit on integer x positions too - same direct-index trick
         found = False
-        # Simple proximity check
-        for x, y, roll, name in self.chart_points:
-            # We need to transform data coords to display coords to check distance pixels
-            # But simpler approach: check if event.xdata is close to integer x
-            if event.xdata is not None and abs(event.xdata - x) < 0.2 and abs(event.ydata - y) < 5:
-                self.tooltip_line.xy = (x, y)
-                self.tooltip_line.set_text(f"{roll}\n{y}")
-                self.tooltip_line.set_visible(True)
-                self.canvas_line.draw_idle()
-                found = True
-                break
-        
+        if event.xdata is not None and event.ydata is not None:
+            idx = int(round(event.xdata))
+            if 0 <= idx < len(self.chart_points):
+                x, y, roll, name = self.chart_points[idx]
+                if abs(event.xdata - x) < 0.2 and abs(event.ydata - y) < 5:
+                    self.tooltip_line.xy = (x, y)
+                    self.tooltip_line.set_text(f"{roll}\n{y}")
+                    self.tooltip_line.set_visible(True)
+                    self._blit_line_tooltip()
+                    found = True
+
         if not found and self.tooltip_line.get_visible():
             self.tooltip_line.set_visible(False)
-            self.canvas_line.draw_idle()
+            self._blit_line_tooltip()
 
     # --- PDF Generation ---
 
@@ -597,14 +886,19 @@ class GradeApp:
         if not save_path:
             return
 
-        # 1. Save charts as temporary images
-        tmp_dir = tempfile.gettempdir()
-        line_chart_path = os.path.join(tmp_dir, "temp_line.png")
-        bar_chart_path = os.path.join(tmp_dir, "temp_bar.png")
-        
-        # Save with white background for PDF readability
-        self.fig_line.savefig(line_chart_path, facecolor='white')
-        self.fig_bar.savefig(bar_chart_path, facecolor='white')
+        # 1. Render charts to in-memory PNGs, reusing the cached render when
+        # nothing has changed since the last export
+        cache = self._pdf_chart_cache
+        cache_key = (self.db.data_version, self.var_sort.get(), self.is_dark_mode)
+        if cache['key'] != cache_key:
+            # Save with white background for PDF readability
+            line_buf = io.BytesIO()
+            self.fig_line.savefig(line_buf, format='png', facecolor='white')
+            bar_buf = io.BytesIO()
+            self.fig_bar.savefig(bar_buf, format='png', facecolor='white')
+            cache['key'] = cache_key
+            cache['line_png'] = line_buf.getvalue()
+            cache['bar_png'] = bar_buf.getvalue()
 
         # 2. Setup PDF Canvas
         c = pdf_canvas.Canvas(save_path, pagesize=A4)
@@ -643,24 +937,32 @@ class GradeApp:
         c.line(40, y_pos - 5, 500, y_pos - 5)
         y_pos -= 25
 
-        # Table Data
-        c.setFont("Helvetica", 10)
-        sorted_students = sorted(self.db.students.items(), key=lambda x: x[1]['marks'], reverse=True)
-        
+        # Table Data - batched into one text object per page instead of five
+        # drawString calls (each a full BT/ET block) per student
+        sorted_students = self.db.get_sorted_list('Marks')
+
+        text = c.beginText()
+        text.setFont("Helvetica", 10)
         for rank, (roll, data) in enumerate(sorted_students, 1):
             if y_pos < 50: # New Page if we run out of space
+                c.drawText(text)
                 c.showPage()
                 y_pos = height - 50
-            
-            c.drawString(40, y_pos, str(rank))
-            c.drawString(80, y_pos, str(roll))
+                text = c.beginText()
+                text.setFont("Helvetica", 10)
+
             # Truncate long names
             name_display = data['name'][:30] + "..." if len(data['name']) > 30 else data['name']
-            c.drawString(180, y_pos, name_display)
-            c.drawString(380, y_pos, str(data['marks']))
-            c.drawString(450, y_pos, get_grade_letter(data['marks']))
+            for x, value in ((40, str(rank)),
+                             (80, str(roll)),
+                             (180, name_display),
+                             (380, str(data['marks'])),
+                             (450, get_grade_letter(data['marks']))):
+                text.setTextOrigin(x, y_pos)
+                text.textOut(value)
             y_pos -= 20
 
+        c.drawText(text)
         c.showPage() # End of text page
 
         # --- Page 2: Charts ---
@@ -668,8 +970,8 @@ class GradeApp:
         c.drawString(50, height - 50, "Visual Analysis")
         
         try:
-            c.drawImage(ImageReader(line_chart_path), 50, height/2 + 20, width=500, height=300)
-            c.drawImage(ImageReader(bar_chart_path), 50, 50, width=500, height=300)
+            c.drawImage(ImageReader(io.BytesIO(cache['line_png'])), 50, height/2 + 20, width=500, height=300)
+            c.drawImage(ImageReader(io.BytesIO(cache['bar_png'])), 50, 50, width=500, height=300)
         except Exception as e:
             c.drawString(50, height/2, f"Error loading charts: {e}")
 